@@ -1,4 +1,9 @@
 from .ticket import Ticket
 from .ai_requester import AiRequester
 from .response import Response
-__ALL__ = [Ticket, AiRequester, Response]
\ No newline at end of file
+from .response_batch import ResponseBatch
+from .render_budget import RenderBudget
+from .concurrency import AdaptiveLimiter, request_batch
+from .result_store import ResultStore
+__ALL__ = [Ticket, AiRequester, Response, ResponseBatch, RenderBudget, AdaptiveLimiter,
+           request_batch, ResultStore]
\ No newline at end of file
@@ -1,16 +1,36 @@
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+
 from . import Ticket
 from .response import Response
 from ollama import chat, ChatResponse
 from .prompts import invoice_prompt
+from .render_budget import RenderBudget
 
 class AiRequester:
     _ticket: Ticket
     _model: str
     _answer: str
+    _budget: RenderBudget | None
+    _elapsed: float | None
 
-    def __init__(self, ticket: Ticket, model: str = "qwen2.5vl:7b"):
+    def __init__(
+        self, ticket: Ticket, model: str = "qwen2.5vl:7b", budget: RenderBudget | None = None
+    ):
         self._ticket = ticket
         self._model = model
+        self._budget = budget
+        self._elapsed = None
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def elapsed(self) -> float | None:
+        """Seconds the last model call took, rendering excluded; None before any answer."""
+        return self._elapsed
 
     @property
     def ticket(self) -> Ticket:
@@ -21,18 +41,26 @@ class AiRequester:
         self._ticket = value
         del self._answer
 
-    def request(self) -> Response:
+    def request(
+        self, slot: Callable[[], AbstractContextManager[None]] = nullcontext
+    ) -> Response:
+        """Render the ticket and ask the model; `slot` wraps only the model call, e.g. an
+        `AdaptiveLimiter.slot` so the limiter times the server and not the render."""
         prompt = f"{invoice_prompt}"
 
-        response: ChatResponse = chat(
-            model=self._model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                    "images": [self._ticket.get_png_data()],
-                }
-            ]
-        )
+        # the client reads the PNG from disk itself; its copies stay budgeted until chat returns
+        with self._ticket.rendered_png(self._budget) as png_path, slot():
+            start = time.perf_counter()
+            response: ChatResponse = chat(
+                model=self._model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt,
+                        "images": [png_path],
+                    }
+                ]
+            )
+            self._elapsed = time.perf_counter() - start
         return Response(response['message']['content'])
 
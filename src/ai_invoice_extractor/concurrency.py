@@ -0,0 +1,178 @@
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
+from typing import Protocol
+
+
+class Requester[T](Protocol):
+    """Anything with a blocking `request()`, such as `AiRequester`.
+
+    `slot` is entered around the call to the server only, so local work before it
+    (rendering, waiting for render memory) is neither limited nor timed.
+    """
+
+    def request(self, slot: Callable[[], AbstractContextManager[None]] = ...) -> T: ...
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the requests in flight against one Ollama host.
+
+    Every completed request is a sample. While the smoothed latency stays within
+    `latency_tolerance` times the best latency of the last `baseline_window` samples
+    (the no-load latency estimate), the server is still absorbing
+    the extra load, so the limit grows by one per window of `limit` samples. A
+    failed request, or latency beyond the tolerance, multiplies it by `backoff`;
+    the samples still in flight then are ignored before the next decrease.
+
+    The baseline being a windowed minimum, one unusually fast answer only holds the
+    limit down until it leaves the window, and a lasting change in latency (another
+    model, bigger documents) is picked up after `baseline_window` samples.
+    """
+
+    _limit: float
+    _in_flight: int
+    _baseline_samples: deque[float]
+    _smoothed_latency: float | None
+    _cooldown: int
+
+    def __init__(
+        self,
+        initial_limit: int = 1,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_tolerance: float = 1.5,
+        backoff: float = 0.7,
+        smoothing: float = 0.2,
+        baseline_window: int = 100,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_tolerance = latency_tolerance
+        self._backoff = backoff
+        self._smoothing = smoothing
+        self._in_flight = 0
+        self._baseline_samples = deque(maxlen=baseline_window)
+        self._smoothed_latency = None
+        self._cooldown = 0
+        self._completed = 0
+        self._errors = 0
+        self._decisions = deque(maxlen=100)
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def max_limit(self) -> int:
+        return self._max_limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def metrics(self) -> dict:
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'baseline_latency': self._baseline_latency,
+                'smoothed_latency': self._smoothed_latency,
+                'completed': self._completed,
+                'errors': self._errors,
+                'decisions': list(self._decisions),
+            }
+
+    @property
+    def _baseline_latency(self) -> float | None:
+        return min(self._baseline_samples, default=None)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait for room under the limit, then time the wrapped request as a sample."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._record(time.perf_counter() - start, error)
+                self._condition.notify_all()
+
+    def record(self, latency: float, error: bool = False):
+        with self._condition:
+            self._record(latency, error)
+            self._condition.notify_all()
+
+    def _record(self, latency: float, error: bool):
+        self._completed += 1
+        if self._cooldown:
+            self._cooldown -= 1
+        if error:
+            self._errors += 1
+            self._decrease('error', latency)
+            return
+        self._baseline_samples.append(latency)
+        baseline = min(self._baseline_samples)
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += self._smoothing * (latency - self._smoothed_latency)
+        if self._smoothed_latency > baseline * self._latency_tolerance:
+            self._decrease('latency', latency)
+        else:
+            previous = self.limit
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            if self.limit != previous:
+                self._decide('increase', latency)
+
+    def _decrease(self, reason: str, latency: float):
+        if self._cooldown:
+            return
+        self._limit = max(self._min_limit, self._limit * self._backoff)
+        # requests started under the old limit still report the old load
+        self._cooldown = math.ceil(self._limit / self._backoff)
+        self._smoothed_latency = None
+        self._decide(f'decrease ({reason})', latency)
+
+    def _decide(self, action: str, latency: float):
+        self._decisions.append({
+            'time': time.time(),
+            'action': action,
+            'limit': self.limit,
+            'latency': latency,
+        })
+
+
+def request_batch[T](
+    requesters: Iterable[Requester[T]], limiter: AdaptiveLimiter
+) -> list[T | Exception]:
+    """Run the requests concurrently under `limiter`, keeping input order.
+
+    Each requester takes a limiter slot around its server call, so the limiter times
+    server latency, not local rendering. A failed request is returned as its exception
+    rather than stopping the batch.
+    """
+    def run(requester: Requester[T]) -> T | Exception:
+        try:
+            return requester.request(limiter.slot)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+        return list(executor.map(run, requesters))
@@ -0,0 +1,206 @@
+"""Non-interactive scoring of model outputs against ground truth.
+
+Usage:
+  python -m ai_invoice_extractor.evaluation tests/test_data/json_batches/3 \\
+      --ground-truth tests/test_data/ground_truth.json --models tests/test_data/models.json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+from .response import FIELDS, Response
+
+NUMERIC_FIELDS = ('total_excluding_vat', 'total_vat', 'total_including_vat')
+TEXT_FIELDS = ('date', 'supplier')
+# points per field, same grid as the manual rating (total 100)
+FIELD_WEIGHTS = np.array([15, 15, 15, 25, 30], dtype=np.float64)
+
+# <base>__<model>__<params>b__<secs>s.json, secs possibly fractional (0.412s)
+_RESULT_FILENAME = re.compile(
+    r"^(?P<base>.+?)__(?P<model>.+?)__(?P<params>\d+)b__(?P<secs>\d+(?:\.\d+)?)s\.json$"
+)
+
+
+def load_json(path: str):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_batch_results(folder: str) -> list[dict]:
+    """Read the raw outputs written by the batch runs, recovering model and timing from names.
+
+    Older outputs named <base>__<model>__<mm>-<ss>.json carry no parameter count, so
+    different sizes of one model cannot be told apart; they are skipped with a warning.
+    """
+    results = []
+    skipped = 0
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith('.json'):
+            continue
+        match = _RESULT_FILENAME.match(name)
+        if not match:
+            skipped += 1
+            continue
+        with open(os.path.join(folder, name), encoding='utf-8') as f:
+            raw = f.read()
+        results.append({
+            'pdf_file': f"{match['base']}.pdf",
+            'model_name': match['model'],
+            'model_parameters': int(match['params']),
+            'elapsed': float(match['secs']),
+            'raw': raw,
+        })
+    if skipped:
+        print(f"Skipped {skipped} output(s) in {folder} without a <params>b__<secs>s name",
+              file=sys.stderr)
+    return results
+
+
+def _extract(raw: str) -> dict | None:
+    """Parsed fields of a raw model output, or None when it is not a valid JSON object.
+
+    An amount the model filled with something that is not a number ("N/A", "abc") keeps
+    its raw text, so it counts as present and never matches, rather than reading as a
+    missing amount.
+    """
+    response = Response(raw)
+    try:
+        fields = {field: getattr(response, field) for field in FIELDS}
+    except ValueError:
+        return None
+    data = json.loads(str(response))
+    for field in NUMERIC_FIELDS:
+        if fields[field] is None and _is_present(data.get(field)):
+            fields[field] = data[field]
+    return fields
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _is_present(value) -> bool:
+    return value is not None and str(value).strip() not in ('', 'None')
+
+
+def _as_text(value) -> str:
+    return str(value).strip().lower() if _is_present(value) else ''
+
+
+def score_results(results: list[dict], ground_truth: dict[str, dict]) -> np.ndarray:
+    """Score every result out of 100 in one pass over (results x fields) matrices.
+
+    A field earns its full weight when the output matches ground truth (numbers within
+    1e-6, text case-insensitively, missing on both sides); outputs that are not valid
+    JSON score 0, as with the manual rating.
+    """
+    if not results:
+        return np.zeros(0)
+    extracted = [_extract(r['raw']) for r in results]
+    parsed = np.array([e is not None for e in extracted])
+    got = [e or {} for e in extracted]
+    expected = [ground_truth[r['pdf_file']] for r in results]
+
+    def present(rows, fields):
+        return np.array([[_is_present(row.get(f)) for f in fields] for row in rows], dtype=bool)
+
+    exp_num = np.array([[_as_float(row.get(f)) for f in NUMERIC_FIELDS] for row in expected])
+    got_num = np.array([[_as_float(row.get(f)) for f in NUMERIC_FIELDS] for row in got])
+    exp_num_present = present(expected, NUMERIC_FIELDS)
+    got_num_present = present(got, NUMERIC_FIELDS)
+    numeric_match = np.where(
+        exp_num_present & got_num_present,
+        np.isclose(exp_num, got_num, rtol=0, atol=1e-6),
+        ~exp_num_present & ~got_num_present,
+    )
+
+    exp_text = np.array([[_as_text(row.get(f)) for f in TEXT_FIELDS] for row in expected],
+                        dtype=object)
+    got_text = np.array([[_as_text(row.get(f)) for f in TEXT_FIELDS] for row in got],
+                        dtype=object)
+    text_match = exp_text == got_text
+
+    matches = np.hstack([numeric_match, text_match])
+    return (matches @ FIELD_WEIGHTS) * parsed
+
+
+def _dominates(a: dict, b: dict) -> bool:
+    keys = ('median_latency', 'p95_latency', 'size')
+    no_worse = a['accuracy'] >= b['accuracy'] and all(a[k] <= b[k] for k in keys)
+    better = a['accuracy'] > b['accuracy'] or any(a[k] < b[k] for k in keys)
+    return no_worse and better
+
+
+def pareto_report(results: list[dict], scores: np.ndarray, models: list[dict]) -> list[dict]:
+    """Aggregate per model: mean accuracy, median/p95 latency and VRAM size, with Pareto flag.
+
+    `models` is the metadata list (name, parameters, size in GB). Rows come sorted by
+    accuracy, best first; `pareto` is True when no other model is at least as good on
+    every axis and strictly better on one. A model missing from `models` has `size` and
+    `pareto` None: it can neither be placed on the front nor push others off it.
+    """
+    sizes = {(m['name'], m['parameters']): m['size'] for m in models}
+    elapsed = np.array([r['elapsed'] for r in results], dtype=np.float64)
+    keys = [(r['model_name'], r['model_parameters']) for r in results]
+    rows = []
+    for key in dict.fromkeys(keys):
+        selected = np.array([k == key for k in keys])
+        name, parameters = key
+        rows.append({
+            'model_name': name,
+            'model_parameters': parameters,
+            'size': sizes.get(key),
+            'documents': int(selected.sum()),
+            'accuracy': float(scores[selected].mean()),
+            'median_latency': float(np.median(elapsed[selected])),
+            'p95_latency': float(np.percentile(elapsed[selected], 95)),
+        })
+    known = [row for row in rows if row['size'] is not None]
+    for row in rows:
+        if row['size'] is None:
+            row['pareto'] = None
+        else:
+            row['pareto'] = not any(_dominates(other, row) for other in known if other is not row)
+    rows.sort(key=lambda row: row['accuracy'], reverse=True)
+    return rows
+
+
+def format_report(rows: list[dict]) -> str:
+    lines = [f"{'model':<28}{'docs':>6}{'accuracy':>10}{'median s':>10}{'p95 s':>8}"
+             f"{'GB':>7}  pareto"]
+    for row in rows:
+        label = f"{row['model_name']}:{row['model_parameters']}b"
+        size = '?' if row['size'] is None else f"{row['size']:.1f}"
+        pareto = {True: '*', False: '', None: '?'}[row['pareto']]
+        lines.append(f"{label:<28}{row['documents']:>6}{row['accuracy']:>10.1f}"
+                     f"{row['median_latency']:>10.1f}{row['p95_latency']:>8.1f}"
+                     f"{size:>7}  {pareto}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy vs latency report of model outputs")
+    parser.add_argument("results", help="Folder of batch outputs (json_batches/<n>)")
+    parser.add_argument("--ground-truth", required=True, help="JSON file: pdf name -> fields")
+    parser.add_argument("--models", required=True, help="JSON file: list of model metadata")
+    args = parser.parse_args(argv)
+
+    ground_truth = load_json(args.ground_truth)
+    results = [r for r in load_batch_results(args.results) if r['pdf_file'] in ground_truth]
+    if not results:
+        print(f"No scorable results in {args.results}", file=sys.stderr)
+        return 1
+    scores = score_results(results, ground_truth)
+    print(format_report(pareto_report(results, scores, load_json(args.models))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import numpy as np
+from PIL import Image
+
+# ink is anything this much darker than the page background (median luma)
+INK_DELTA = 40
+CROP_MARGIN = 24
+# rows/columns with less ink than this share of their length are treated as scan noise
+MIN_INK_SHARE = 0.005
+MAX_SKEW_DEGREES = 5.0
+SKEW_STEP_DEGREES = 0.25
+# deskew works on a downsampled mask, this is its longest side in pixels
+SKEW_SAMPLE_SIZE = 800
+# and on at most this many ink points, so its memory does not grow with the ink coverage
+SKEW_MAX_POINTS = 50_000
+# bytes per page pixel held while cropping: RGB page, luma, mask and the RGB crop
+CROP_BYTES_PER_PIXEL = 8
+# plus the expanded RGB rotation when deskewing
+DESKEW_BYTES_PER_PIXEL = 4
+
+
+def crop_working_bytes(pixels: int, deskew: bool = False) -> int:
+    """Memory needed to crop a decoded page of `pixels` pixels."""
+    per_pixel = CROP_BYTES_PER_PIXEL + (DESKEW_BYTES_PER_PIXEL if deskew else 0)
+    return pixels * per_pixel
+
+
+def _grayscale(image: Image.Image) -> np.ndarray:
+    return np.asarray(image.convert('L'))
+
+
+def background_threshold(gray: np.ndarray, delta: int = INK_DELTA) -> int:
+    """Ink threshold below the page background, which is most of the page on a receipt scan.
+
+    A white page gives 215, a grey phone-scan background at luma 180 gives 140.
+    """
+    background = int(np.median(gray[::4, ::4]))
+    return max(1, background - delta)
+
+
+def ink_mask(image: Image.Image, threshold: int | None = None) -> np.ndarray:
+    """Boolean mask of the ink pixels; the threshold defaults to one derived from the
+    page background."""
+    gray = _grayscale(image)
+    if threshold is None:
+        threshold = background_threshold(gray)
+    return gray < threshold
+
+
+def content_bbox(
+    mask: np.ndarray, min_ink_share: float = MIN_INK_SHARE
+) -> tuple[int, int, int, int] | None:
+    """Return (left, top, right, bottom) of the inked region, or None for a blank page."""
+    height, width = mask.shape
+    rows = np.flatnonzero(mask.sum(axis=1) > width * min_ink_share)
+    cols = np.flatnonzero(mask.sum(axis=0) > height * min_ink_share)
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def estimate_skew(mask: np.ndarray) -> float:
+    """Angle in degrees that makes text lines horizontal, by projection-profile search.
+
+    Each candidate angle shears the ink coordinates and scores how peaked the row
+    histogram gets; text lines aligned with the rows give the sharpest profile. Angles
+    are scored one at a time over a capped sample of ink points to keep memory bounded.
+    """
+    step = max(1, max(mask.shape) // SKEW_SAMPLE_SIZE)
+    ys, xs = np.nonzero(mask[::step, ::step])
+    if ys.size == 0:
+        return 0.0
+    if ys.size > SKEW_MAX_POINTS:
+        stride = -(-ys.size // SKEW_MAX_POINTS)
+        ys, xs = ys[::stride], xs[::stride]
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64)
+    angles = np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + SKEW_STEP_DEGREES, SKEW_STEP_DEGREES)
+    scores = np.empty(angles.size)
+    for i, slope in enumerate(np.tan(np.radians(angles))):
+        # projected row index of every ink point
+        projected = np.rint(ys + slope * xs).astype(np.int64)
+        projected -= projected.min()
+        histogram = np.bincount(projected).astype(np.float64)
+        scores[i] = np.dot(histogram, histogram)
+    return float(angles[int(np.argmax(scores))])
+
+
+def crop_to_content(
+    image: Image.Image,
+    margin: int = CROP_MARGIN,
+    deskew: bool = False,
+    threshold: int | None = None,
+) -> tuple[Image.Image, dict[str, int]]:
+    """Crop a rendered page to its inked region plus `margin`, optionally deskewing first.
+
+    The ink threshold defaults to one derived from the page background. Returns the new
+    image and the pixel counts before and after, so the reduction of the vision input
+    can be reported.
+    """
+    original_pixels = image.width * image.height
+    gray = _grayscale(image)
+    if threshold is None:
+        threshold = background_threshold(gray)
+    if deskew:
+        angle = estimate_skew(gray < threshold)
+        if angle:
+            # the estimate is the counter-clockwise tilt of the page, rotate it back
+            background = int(np.median(gray[::4, ::4]))
+            image = image.rotate(-angle, resample=Image.Resampling.BICUBIC, expand=True,
+                                 fillcolor=(background,) * len(image.getbands()))
+            gray = _grayscale(image)
+    bbox = content_bbox(gray < threshold)
+    if bbox is not None:
+        left, top, right, bottom = bbox
+        image = image.crop((
+            max(0, left - margin),
+            max(0, top - margin),
+            min(image.width, right + margin),
+            min(image.height, bottom + margin),
+        ))
+    return image, {
+        'original_pixels': original_pixels,
+        'cropped_pixels': image.width * image.height,
+    }
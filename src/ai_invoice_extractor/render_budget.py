@@ -0,0 +1,54 @@
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class RenderBudget:
+    """Caps the raster memory held by concurrent page renders of one worker.
+
+    A render that does not fit waits until enough in-flight renders finish. A render
+    larger than the whole budget is still allowed, but only when nothing else is running.
+
+    A worker creates one budget and passes it to every `AiRequester` it builds, so all
+    of its renders, whatever thread they run on, draw from the same pool.
+    """
+
+    _max_bytes: int
+    _in_flight_bytes: int
+    _peak_bytes: int
+
+    def __init__(self, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self._max_bytes = max_bytes
+        self._in_flight_bytes = 0
+        self._peak_bytes = 0
+        self._condition = threading.Condition()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def in_flight_bytes(self) -> int:
+        return self._in_flight_bytes
+
+    @property
+    def peak_bytes(self) -> int:
+        return self._peak_bytes
+
+    def _fits(self, nbytes: int) -> bool:
+        return self._in_flight_bytes == 0 or self._in_flight_bytes + nbytes <= self._max_bytes
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[None]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._fits(nbytes))
+            self._in_flight_bytes += nbytes
+            self._peak_bytes = max(self._peak_bytes, self._in_flight_bytes)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight_bytes -= nbytes
+                self._condition.notify_all()
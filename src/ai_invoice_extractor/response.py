@@ -1,7 +1,89 @@
 import json
+import re
+from datetime import datetime
+
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y')
+
+
+# "1,234", "1.234" or "12,345,678": a single kind of separator, each followed by three digits
+_THOUSANDS_ONLY = re.compile(r"-?[1-9]\d{0,2}(?:([,.])\d{3})(?:\1\d{3})*")
+
+
+def normalize_amount(value) -> float | None:
+    """Amount as a float, accepting strings such as "62,52", "62.52 €" or "1,234".
+
+    A separator followed by exactly three digits and nothing else groups thousands, so
+    "1,234" is 1234; amounts with three decimals are not supported.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^\d,.\-]", "", str(value))
+    if ',' in cleaned and '.' in cleaned:
+        # the separator that comes first groups thousands: "1.234,56" or "1,234.56"
+        thousands = ',' if cleaned.index(',') < cleaned.index('.') else '.'
+        cleaned = cleaned.replace(thousands, '')
+    elif match := _THOUSANDS_ONLY.fullmatch(cleaned):
+        cleaned = cleaned.replace(match[1], '')
+    cleaned = cleaned.replace(',', '.')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def normalize_date(value) -> str | None:
+    """Date as ISO YYYY-MM-DD, from the DD/MM/YYYY the prompt asks for or close variants."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+FIELDS = ('total_excluding_vat', 'total_vat', 'total_including_vat', 'date', 'supplier')
+
+
+def strip_fences(json_data: str) -> str:
+    return json_data.replace('```json', '').replace('```', '').strip()
+
+
+def parse_fields(json_data: str) -> tuple[float | None, float | None, float | None,
+                                          str | None, str | None]:
+    """Typed field values, in FIELDS order, of a fence-free JSON model output."""
+    try:
+        response = json.loads(json_data)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to deserialize JSON response: {str(e)}") from e
+    if not isinstance(response, dict):
+        raise ValueError("Failed to deserialize JSON response: expected a JSON object")
+    date = response.get('date')
+    supplier = response.get('supplier')
+    return (
+        normalize_amount(response.get('total_excluding_vat')),
+        normalize_amount(response.get('total_vat')),
+        normalize_amount(response.get('total_including_vat')),
+        str(date) if date is not None else None,
+        str(supplier) if supplier is not None else None,
+    )
+
 
 class Response:
+    """Model output for one document. Fields are parsed on first access.
+
+    Reading a field of an output that is not valid JSON raises ValueError.
+    """
+
+    __slots__ = ('_json', '_parsed', '_total_excluding_vat', '_total_vat',
+                 '_total_including_vat', '_date', '_supplier')
+
     _json: str
+    _parsed: bool
     _total_excluding_vat: float | None
     _total_vat: float | None
     _total_including_vat: float | None
@@ -9,19 +91,40 @@ class Response:
     _supplier: str | None
 
     def __init__(self, json_data: str):
-        self._json = json_data.replace('```json', '').replace('```', '').strip()
+        self._json = strip_fences(json_data)
+        self._parsed = False
+        self._total_excluding_vat = None
+        self._total_vat = None
+        self._total_including_vat = None
+        self._date = None
+        self._supplier = None
 
     def __str__(self):
         return self._json
 
-    def deserialize(self) -> Response:
-        try:
-            response = json.loads(self._json)
-            self._total_excluding_vat = response.get('total_excluding_vat')
-            self._total_vat = response.get('total_vat')
-            self._total_including_vat = response.get('total_including_vat')
-            self._date = response.get('date')
-            self._supplier = response.get('supplier')
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to deserialize JSON response: {str(e)}") from e
+    def deserialize(self) -> "Response":
+        if not self._parsed:
+            (self._total_excluding_vat, self._total_vat, self._total_including_vat,
+             self._date, self._supplier) = parse_fields(self._json)
+            self._parsed = True
         return self
+
+    @property
+    def total_excluding_vat(self) -> float | None:
+        return self.deserialize()._total_excluding_vat
+
+    @property
+    def total_vat(self) -> float | None:
+        return self.deserialize()._total_vat
+
+    @property
+    def total_including_vat(self) -> float | None:
+        return self.deserialize()._total_including_vat
+
+    @property
+    def date(self) -> str | None:
+        return self.deserialize()._date
+
+    @property
+    def supplier(self) -> str | None:
+        return self.deserialize()._supplier
@@ -0,0 +1,113 @@
+import csv
+import math
+from array import array
+from collections.abc import Iterable
+
+import numpy as np
+
+from .response import FIELDS, Response, parse_fields, strip_fences
+
+AMOUNT_FIELDS = ('total_excluding_vat', 'total_vat', 'total_including_vat')
+
+
+class ResponseBatch:
+    """Many model outputs held as columns instead of one Response object per result.
+
+    Amounts live in C double arrays (NaN when missing), so sums run in NumPy over the
+    raw buffers. Columns handed out are copies: a view held by the caller would pin the
+    buffer and make the next `append` fail. Outputs that are not valid JSON are kept as
+    rows with empty fields and `parsed` False. The raw text is only kept with `keep_raw`.
+    """
+
+    __slots__ = ('_amounts', '_date', '_supplier', '_parsed', '_raw')
+
+    _amounts: dict[str, array]
+    _date: list[str | None]
+    _supplier: list[str | None]
+    _parsed: array
+    _raw: list[str] | None
+
+    def __init__(self, responses: Iterable[Response | str] = (), keep_raw: bool = False):
+        self._amounts = {field: array('d') for field in AMOUNT_FIELDS}
+        self._date = []
+        self._supplier = []
+        self._parsed = array('b')
+        self._raw = [] if keep_raw else None
+        self.extend(responses)
+
+    def __len__(self) -> int:
+        return len(self._parsed)
+
+    def append(self, response: Response | str):
+        json_data = str(response) if isinstance(response, Response) else strip_fences(response)
+        try:
+            values = parse_fields(json_data)
+            parsed = True
+        except ValueError:
+            values = (None,) * len(FIELDS)
+            parsed = False
+        *amounts, date, supplier = values
+        for field, amount in zip(AMOUNT_FIELDS, amounts):
+            self._amounts[field].append(math.nan if amount is None else amount)
+        self._date.append(date)
+        self._supplier.append(supplier)
+        self._parsed.append(parsed)
+        if self._raw is not None:
+            self._raw.append(json_data)
+
+    def extend(self, responses: Iterable[Response | str]):
+        for response in responses:
+            self.append(response)
+
+    def column(self, field: str) -> np.ndarray:
+        """A copy of one column as a NumPy array."""
+        if field in self._amounts:
+            return np.array(self._amounts[field], dtype=np.float64)
+        if field == 'parsed':
+            return np.frombuffer(self._parsed, dtype=np.int8).astype(bool)
+        if field == 'raw' and self._raw is not None:
+            return np.array(self._raw, dtype=object)
+        if field in ('date', 'supplier'):
+            return np.array(getattr(self, f"_{field}"), dtype=object)
+        raise KeyError(field)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        names = [*FIELDS, 'parsed'] + (['raw'] if self._raw is not None else [])
+        return {name: self.column(name) for name in names}
+
+    def sum(self, field: str) -> float:
+        """Sum of an amount column, missing values skipped."""
+        if field not in self._amounts:
+            raise KeyError(field)
+        # zero-copy view, released before returning so the batch can still grow
+        return float(np.nansum(np.frombuffer(self._amounts[field], dtype=np.float64)))
+
+    def totals(self) -> dict[str, float]:
+        return {field: self.sum(field) for field in AMOUNT_FIELDS}
+
+    def to_csv(self, path: str):
+        names = [*FIELDS, 'parsed'] + (['raw'] if self._raw is not None else [])
+        amounts = [self._amounts[field] for field in AMOUNT_FIELDS]
+        rows = zip(*amounts, self._date, self._supplier, (bool(p) for p in self._parsed),
+                   *([self._raw] if self._raw is not None else []))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            writer.writerows(
+                ['' if isinstance(v, float) and math.isnan(v) else v for v in row]
+                for row in rows
+            )
+
+    def to_parquet(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Parquet export, install the "
+                              "`parquet` extra: `uv sync --extra parquet`.") from e
+        table = pa.table({
+            name: pa.array(values, from_pandas=True) if name in AMOUNT_FIELDS
+            else pa.array(values.tolist())
+            for name, values in self.columns().items()
+        })
+        pq.write_table(table, path)
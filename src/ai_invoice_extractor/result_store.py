@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import UTC, date, datetime
+
+from .response import FIELDS, Response, normalize_date
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    source_hash TEXT NOT NULL,
+    source_path TEXT,
+    model TEXT NOT NULL,
+    elapsed_seconds REAL,
+    created_at TEXT NOT NULL,
+    total_excluding_vat REAL,
+    total_vat REAL,
+    total_including_vat REAL,
+    date TEXT,
+    supplier TEXT COLLATE NOCASE,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_source_hash ON results (source_hash);
+CREATE INDEX IF NOT EXISTS results_supplier ON results (supplier);
+CREATE INDEX IF NOT EXISTS results_date ON results (date);
+CREATE INDEX IF NOT EXISTS results_total_including_vat ON results (total_including_vat);
+"""
+
+COLUMNS = (
+    'source_hash', 'source_path', 'model', 'elapsed_seconds', 'created_at',
+    'total_excluding_vat', 'total_vat', 'total_including_vat', 'date', 'supplier', 'raw',
+)
+AMOUNT_COLUMNS = ('total_excluding_vat', 'total_vat', 'total_including_vat')
+
+
+def result_record(
+    response: Response | str,
+    source_hash: str,
+    model: str,
+    elapsed_seconds: float | None = None,
+    source_path: str | None = None,
+) -> dict:
+    """Row for the store: the parsed fields normalized to floats and ISO dates, plus the raw
+    output. A response that is not valid JSON is kept with empty fields."""
+    if isinstance(response, str):
+        response = Response(response)
+    try:
+        fields = {
+            'total_excluding_vat': response.total_excluding_vat,
+            'total_vat': response.total_vat,
+            'total_including_vat': response.total_including_vat,
+            'date': normalize_date(response.date),
+            'supplier': response.supplier.strip() if response.supplier else None,
+        }
+    except ValueError:
+        fields = dict.fromkeys(FIELDS)
+    return {
+        'source_hash': source_hash,
+        'source_path': source_path,
+        'model': model,
+        'elapsed_seconds': elapsed_seconds,
+        'created_at': datetime.now(UTC).isoformat(timespec='seconds'),
+        **fields,
+        'raw': str(response),
+    }
+
+
+def _iso_date(value: date | str) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    iso = normalize_date(value)
+    if iso is None:
+        raise ValueError(f"Unrecognized date {value!r}")
+    return iso
+
+
+class ResultStore:
+    """Extraction results in an indexed SQLite file, queryable without re-parsing outputs.
+
+    One store can be shared by threads: its single connection is serialized by a lock,
+    so one thread's transaction never commits or rolls back another's inserts.
+    """
+
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def add(self, response: Response | str, source_hash: str, model: str,
+            elapsed_seconds: float | None = None, source_path: str | None = None):
+        self.add_many([result_record(response, source_hash, model, elapsed_seconds, source_path)])
+
+    def add_many(self, records: Iterable[dict]):
+        """Bulk insert records built by `result_record`, in a single transaction."""
+        placeholders = ", ".join(f":{column}" for column in COLUMNS)
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                records,
+            )
+
+    def _select(self, where: str, parameters: tuple) -> list[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM results WHERE {where} ORDER BY id", parameters
+            )
+            return [dict(row) for row in rows]
+
+    def by_source_hash(self, source_hash: str) -> list[dict]:
+        return self._select("source_hash = ?", (source_hash,))
+
+    def by_supplier(self, supplier: str, partial: bool = False) -> list[dict]:
+        """Case-insensitive supplier match; `partial` matches a substring (not indexed)."""
+        if partial:
+            term = supplier.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            return self._select("supplier LIKE ? ESCAPE '\\'", (f"%{term}%",))
+        return self._select("supplier = ?", (supplier,))
+
+    def by_date_range(self, start: date | str, end: date | str) -> list[dict]:
+        """Results dated between `start` and `end`, both included; string bounds are read
+        like model dates ("01/08/2025" or ISO)."""
+        return self._select("date BETWEEN ? AND ?", (_iso_date(start), _iso_date(end)))
+
+    def by_amount_range(self, minimum: float, maximum: float,
+                        column: str = 'total_including_vat') -> list[dict]:
+        if column not in AMOUNT_COLUMNS:
+            raise ValueError(f"Unknown amount column {column}")
+        return self._select(f"{column} BETWEEN ? AND ?", (minimum, maximum))
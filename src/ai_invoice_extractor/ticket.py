@@ -1,38 +1,140 @@
 from pdf2image import convert_from_path, pdfinfo_from_path
-import os, io
+import hashlib, os, re, tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
 
 from pdf2image.exceptions import PDFInfoNotInstalledError
+from PIL import Image
+
+from .preprocessing import crop_to_content, crop_working_bytes
+from .render_budget import RenderBudget
+
+RENDER_DPI = 200
+# pdfinfo reports e.g. "595.276 x 841.89 pts (A4)"
+_PAGE_SIZE_PATTERN = re.compile(r"([\d.]+) x ([\d.]+) pts")
+_A4_POINTS = (595.276, 841.89)
+
+
+def _png_held_bytes(png_bytes: int) -> int:
+    """Memory a rendered PNG takes while it is sent: the file (on tmpfs by default), the
+    bytes the Ollama client reads from it and their base64 encoding."""
+    return 2 * png_bytes + -(-png_bytes * 4 // 3)
+
+
+def _render_dir() -> str | None:
+    """Where poppler writes the rendered page: tmpfs when available, else the system temp."""
+    configured = os.environ.get("AI_INVOICE_EXTRACTOR_TMPDIR")
+    if configured:
+        return configured
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return None
 
 
 class Ticket:
     _pdf_path: str
+    _page_size: tuple[float, float]
+    _render_stats: dict[str, int]
+    _crop: bool
+    _deskew: bool
+
+    def __init__(self, pdf_path, crop: bool = False, deskew: bool = False):
+        self._load(pdf_path)
+        self._render_stats = {}
+        self._crop = crop
+        self._deskew = deskew
 
-    def __init__(self, pdf_path):
+    def _load(self, pdf_path):
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"File {pdf_path} does not exist")
-        if pdfinfo_from_path(pdf_path)['Pages'] > 1:
+        info = pdfinfo_from_path(pdf_path)
+        if info['Pages'] > 1:
             raise ValueError("PDF has more than one page")
+        match = _PAGE_SIZE_PATTERN.search(str(info.get('Page size', '')))
+        self._page_size = (float(match[1]), float(match[2])) if match else _A4_POINTS
         self._pdf_path = pdf_path
 
-
     @property
     def pdf_path(self) -> str:
         return self._pdf_path
 
     @pdf_path.setter
     def pdf_path(self, value):
-        if not os.path.exists(value):
-                        raise FileNotFoundError(f"File {value} does not exist")
-        if pdfinfo_from_path(value)['Pages'] > 1:
-            raise Exception("PDF has more than one page")
-        self._pdf_path = value
+        self._load(value)
 
-    def get_png_data(self) -> bytes:
-        try:
-            pdf_images = convert_from_path(self._pdf_path)
-        except PDFInfoNotInstalledError as e:
-            raise PDFInfoNotInstalledError("poppler is not installed and add it to the PATH.") from e
-        buffer = io.BytesIO()
-        pdf_images[0].save(buffer, 'PNG')
-        return buffer.getvalue()
+    @property
+    def render_stats(self) -> dict[str, int]:
+        """Figures of the last render: `estimated_raster_bytes` (the page raster poppler
+        holds, estimated from the page size, not measured), encoded PNG size and, when
+        cropping is enabled, the page pixel count before and after the crop."""
+        return dict(self._render_stats)
+
+    @property
+    def source_hash(self) -> str:
+        """SHA-256 of the PDF file, identifies the document whatever its name."""
+        with open(self._pdf_path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+    def estimate_render_bytes(self, dpi: int = RENDER_DPI) -> int:
+        width_pt, height_pt = self._page_size
+        return round(width_pt * dpi / 72) * round(height_pt * dpi / 72) * 3
 
+    @contextmanager
+    def rendered_png(self, budget: RenderBudget | None = None) -> Iterator[Path]:
+        """Render the page straight to a temporary PNG file and yield its path.
+
+        Only the first page is rasterized and poppler encodes the PNG itself, so no PIL
+        image or in-memory copy of the file is kept. With `crop` the page is decoded once
+        more to cut it down to the receipt region, and the budget reservation covers that
+        working set too. Once the render is done, its reservation is swapped for one the
+        size of the PNG copies held while the caller sends it, kept until the caller exits.
+        The file is removed on exit.
+        """
+        raster_bytes = self.estimate_render_bytes()
+        reserved_bytes = raster_bytes
+        if self._crop:
+            # poppler has exited by the time the page is decoded, the two do not overlap
+            pixels = raster_bytes // 3
+            reserved_bytes = max(raster_bytes, crop_working_bytes(pixels, self._deskew))
+        with tempfile.TemporaryDirectory(dir=_render_dir()) as output_folder:
+            reservation = budget.reserve(reserved_bytes) if budget else nullcontext()
+            with reservation:
+                try:
+                    png_paths = convert_from_path(
+                        self._pdf_path,
+                        dpi=RENDER_DPI,
+                        first_page=1,
+                        last_page=1,
+                        output_folder=output_folder,
+                        fmt='png',
+                        single_file=True,
+                        paths_only=True,
+                    )
+                except PDFInfoNotInstalledError as e:
+                    raise PDFInfoNotInstalledError(
+                        "poppler is not installed and add it to the PATH."
+                    ) from e
+                png_path = Path(str(png_paths[0]))
+                crop_stats = self._crop_png(png_path) if self._crop else {}
+            png_bytes = png_path.stat().st_size
+            self._render_stats = {
+                'estimated_raster_bytes': raster_bytes,
+                'png_bytes': png_bytes,
+                **crop_stats,
+            }
+            held = budget.reserve(_png_held_bytes(png_bytes)) if budget else nullcontext()
+            with held:
+                yield png_path
+
+    def _crop_png(self, png_path: Path) -> dict[str, int]:
+        with Image.open(png_path) as page:
+            page.load()
+            rgb = page if page.mode == 'RGB' else page.convert('RGB')
+            cropped, stats = crop_to_content(rgb, deskew=self._deskew)
+        cropped.save(png_path, 'PNG')
+        return stats
+
+    def get_png_data(self) -> bytes:
+        with self.rendered_png() as png_path:
+            return png_path.read_bytes()
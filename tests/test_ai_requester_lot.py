@@ -2,121 +2,16 @@ import os
 import time
 import threading
 import queue
-from ai_invoice_extractor import Ticket, AiRequester, Response
-
-models = [
-    {
-        "name": "qwen2.5vl",
-        "parameters": 3,
-        "size": 3.2
-    },
-    {
-        "name": "qwen2.5vl",
-        "parameters": 7,
-        "size": 6.0
-    },
-    {
-        "name": "granite3.2-vision",
-        "parameters": 2,
-        "size": 2.4
-    },
-    {
-        "name": "qwen2.5vl",
-        "parameters": 32,
-        "size": 21.0
-    },
-    {
-        "name": "mistral-small3.2",
-        "parameters": 24,
-        "size": 15.0
-    }
-]
-supposed = {
-    "invoice-test-1.pdf": {
-        "total_excluding_vat": 62.52,
-        "total_vat": 12.50,
-        "total_including_vat": 75.02,
-        "date": "26/08/2025",
-        "supplier": "Station Mairie ARVIEU"
-    },
-    "invoice-test-2.pdf": {
-        "total_excluding_vat": 62.52,
-        "total_vat": 12.50,
-        "total_including_vat": 75.02,
-        "date": "26/08/2025",
-        "supplier": "Station Mairie ARVIEU"
-    },
-    "invoice-test-3.pdf": {
-        "total_excluding_vat": 62.52,
-        "total_vat": 12.50,
-        "total_including_vat": 75.02,
-        "date": "26/08/2025",
-        "supplier": "Station Mairie ARVIEU"
-    },
-    "invoice-test-4.pdf": {
-        "total_excluding_vat": 23.38,
-        "total_vat": 4.68,
-        "total_including_vat": 28.06,
-        "date": "27/08/2025",
-        "supplier": "SARL GARAGE MONTEILLET"
-    },
-    "invoice-test-5.pdf": {
-        "total_excluding_vat": 28.18,
-        "total_vat": 2.82,
-        "total_including_vat": 31.00,
-        "date": "03/07/2025",
-        "supplier": "Restaurant L'atelier"
-    },
-    "invoice-test-6.pdf": {
-        "total_excluding_vat": None,
-        "total_vat": None,
-        "total_including_vat": None,
-        "date": None,
-        "supplier": None
-    },
-    "invoice-test-7.pdf": {
-        "total_excluding_vat": 32.98,
-        "total_vat": 6.60,
-        "total_including_vat": 39.57,
-        "date": "04/07/2025",
-        "supplier": "BRICO DEPOT"
-    },
-    "invoice-test-8.pdf": {
-        "total_excluding_vat": 32.98,
-        "total_vat": 6.60,
-        "total_including_vat": 39.57,
-        "date": "04/07/2025",
-        "supplier": "Brico Dépôt S.A.S."
-    },
-    "invoice-test-9.pdf": {
-        "total_excluding_vat": None,
-        "total_vat": None,
-        "total_including_vat": 56.80,
-        "date": "04/07/2025",
-        "supplier": "CREDIT AGRICOLE"
-    },
-    "invoice-test-10.pdf": {
-        "total_excluding_vat": None,
-        "total_vat": None,
-        "total_including_vat": 12.25,
-        "date": "03/07/2025",
-        "supplier": "MALRIEU SA"
-    },
-    "invoice-test-11.pdf": {
-        "total_excluding_vat": 10.21,
-        "total_vat": 2.04,
-        "total_including_vat": 12.25,
-        "date": "03/07/2025",
-        "supplier": "MALRIEU DISTRIBUTION SAS"
-    },
-    "invoice-test-12.pdf": {
-        "total_excluding_vat": 10.21,
-        "total_vat": 2.04,
-        "total_including_vat": 12.25,
-        "date": "03/07/2025",
-        "supplier": "MALRIEU DISTRIBUTION SAS"
-    }
-}
+from ai_invoice_extractor import Ticket, AiRequester, Response, ResultStore, RenderBudget
+from ai_invoice_extractor import AdaptiveLimiter, request_batch
+from ai_invoice_extractor.evaluation import load_json
+
+models = load_json(os.path.join(os.path.dirname(__file__), 'test_data', 'models.json'))
+supposed = load_json(os.path.join(os.path.dirname(__file__), 'test_data', 'ground_truth.json'))
+# raster memory shared by the renders of one worker
+RENDER_BUDGET_BYTES = 256 * 1024 * 1024
+# upper bound for the adaptive limit on requests in flight against the Ollama host
+MAX_CONCURRENT_REQUESTS = 8
 
 
 def _next_batch_folder(base_dir: str) -> str:
@@ -153,7 +48,7 @@ def test_batch_invoice_to_json():
     """Batch test that converts PDFs to Ticket, sends to AiRequester and writes responses.
 
     This test intentionally writes output files under tests/test_data/json_batches/<n>.
-    Each output filename: <pdf-basename>__<model>__<mm-ss>.json and content is str(response).
+    Each output filename: <pdf-basename>__<model>__<params>b__<secs>s.json and content is str(response).
     """
     root = os.path.dirname(__file__)
     pdf_dir = os.path.join(root, 'test_data', 'pdf')
@@ -161,8 +56,11 @@ def test_batch_invoice_to_json():
 
     # create next numbered batch folder
     out_dir = _next_batch_folder(batches_base)
+    store = ResultStore(os.path.join(batches_base, 'results.sqlite'))
+    budget = RenderBudget(RENDER_BUDGET_BYTES)
 
     model_name = "qwen2.5vl"
+    model_parameters = 7
 
     assert os.path.isdir(pdf_dir), f"PDF dir not found: {pdf_dir}"
 
@@ -170,35 +68,30 @@ def test_batch_invoice_to_json():
     total = len(files)
     assert total > 0, f"No PDF files found in {pdf_dir}"
 
-    cumulative_elapsed = 0.0
-
-    for idx, filename in enumerate(files, start=1):
-        pdf_path = os.path.join(pdf_dir, filename)
-        ticket = Ticket(pdf_path)
-        requester = AiRequester(ticket)
-
-        print(f"Processing [{idx}/{total}] {filename}...")
-        start = time.perf_counter()
-        try:
-            response = requester.request()
-        except Exception as e:
-            # Record the exception text as response so the test output contains useful info.
-            response = str(e)
-        end = time.perf_counter()
-
-        elapsed = end - start
-        cumulative_elapsed += elapsed
-        avg = cumulative_elapsed / idx
-        remaining = avg * (total - idx)
-
-        # format for filename (safe) and for display (readable)
-        elapsed_str_filename = _format_elapsed(elapsed, sep='-')
-        remaining_str_filename = _format_elapsed(remaining, sep='-')
+    requesters = [
+        AiRequester(Ticket(os.path.join(pdf_dir, filename)),
+                    model=f"{model_name}:{model_parameters}b", budget=budget)
+        for filename in files
+    ]
+    limiter = AdaptiveLimiter(max_limit=MAX_CONCURRENT_REQUESTS)
+
+    print(f"Processing {total} PDFs, up to {MAX_CONCURRENT_REQUESTS} requests at a time...")
+    start = time.perf_counter()
+    responses = request_batch(requesters, limiter)
+    wall = time.perf_counter() - start
+
+    for idx, (filename, requester, response) in enumerate(zip(files, requesters, responses),
+                                                          start=1):
+        if isinstance(response, Exception):
+            # a failed request is not a model output, keep it out of the outputs and the store
+            print(f"Failed [{idx}/{total}] {filename}: {response}\n")
+            continue
+        ticket = requester.ticket
+        elapsed = requester.elapsed or 0.0
         elapsed_str_display = _format_elapsed(elapsed, sep=':')
-        remaining_str_display = _format_elapsed(remaining, sep=':')
 
         base_name = os.path.splitext(filename)[0]
-        json_filename = f"{base_name}__{model_name}__{elapsed_str_filename}.json"
+        json_filename = f"{base_name}__{model_name}__{model_parameters}b__{elapsed:.3f}s.json"
         json_path = os.path.join(out_dir, json_filename)
 
         # write the string form of the Response (do not modify Response class)
@@ -206,10 +99,23 @@ def test_batch_invoice_to_json():
         # write raw content directly (user requested no json wrapper)
         with open(json_path, 'w', encoding='utf-8') as f:
             f.write(content)
-
-        percent = (idx / total) * 100
-        print(f"Done [{idx}/{total}] {filename} — took {elapsed_str_display}, ETA {remaining_str_display} — {percent:.1f}%")
+        store.add(content, ticket.source_hash, requester.model, elapsed, ticket.pdf_path)
+
+        raster_mb = ticket.render_stats.get('estimated_raster_bytes', 0) / 1e6
+        print(f"Done [{idx}/{total}] {filename} — model took {elapsed_str_display}")
+        print(f"Estimated render memory: {raster_mb:.1f} MB")
+        if 'cropped_pixels' in ticket.render_stats:
+            kept = ticket.render_stats['cropped_pixels'] / ticket.render_stats['original_pixels']
+            print(f"Cropped to {kept:.0%} of the page pixels")
         print(f"Wrote {json_path}\n")
+    store.close()
+    metrics = limiter.metrics
+    print(f"Batch took {_format_elapsed(wall, sep=':')}, final limit {metrics['limit']}, "
+          f"{metrics['completed']} completed, {metrics['errors']} errors")
+    for decision in metrics['decisions']:
+        print(f"  {decision['action']} -> limit {decision['limit']} "
+              f"(latency {decision['latency']:.1f}s)")
+    print(f"Peak reserved render memory: {budget.peak_bytes / 1e6:.1f} MB")
 
 class Metrics:
     def __init__(self, csv_path: str | None = None):
@@ -303,7 +209,7 @@ def test_evaluate_models_capabilities():
                 elapsed = end - start
                 elapsed_str_display = _format_elapsed(elapsed, sep=':')
                 base_name = os.path.splitext(file)[0]
-                json_filename = f"{base_name}__{model['name']}__{_format_elapsed(elapsed, sep='-')}.json"
+                json_filename = f"{base_name}__{model['name']}__{model['parameters']}b__{elapsed:.3f}s.json"
                 json_path = os.path.join(out_dir, json_filename)
                 content = str(response)
                 with open(json_path, 'w', encoding='utf-8') as f:
@@ -460,6 +366,7 @@ def ai_worker(pdf_files, models, rating_queue, batches_base, processed_set=None)
     import os
     import time
     out_dir = _next_batch_folder(batches_base)
+    budget = RenderBudget(RENDER_BUDGET_BYTES)
     for idx, file in enumerate(pdf_files, start=1):
         pdf_path = os.path.join(os.path.dirname(__file__), 'test_data', 'pdf', file)
         ticket = Ticket(pdf_path)
@@ -469,7 +376,8 @@ def ai_worker(pdf_files, models, rating_queue, batches_base, processed_set=None)
                 # Skip already-processed combination
                 print(f"Skipping already processed: {file} | {model['name']}:{model['parameters']}b")
                 continue
-            requester = AiRequester(ticket, model=f"{model['name']}:{model['parameters']}b")
+            requester = AiRequester(ticket, model=f"{model['name']}:{model['parameters']}b",
+                                    budget=budget)
             start = time.perf_counter()
             try:
                 response = requester.request()
@@ -479,7 +387,7 @@ def ai_worker(pdf_files, models, rating_queue, batches_base, processed_set=None)
             elapsed = end - start
             # Sauvegarde la réponse comme avant
             base_name = os.path.splitext(file)[0]
-            json_filename = f"{base_name}__{model['name']}__{model['parameters']}b__{int(elapsed)}s.json"
+            json_filename = f"{base_name}__{model['name']}__{model['parameters']}b__{elapsed:.3f}s.json"
             json_path = os.path.join(out_dir, json_filename)
             with open(json_path, 'w', encoding='utf-8') as f:
                 f.write(str(response))
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+
+from pytest import raises
+
+from ai_invoice_extractor.concurrency import AdaptiveLimiter, request_batch
+
+
+class StubServer:
+    """Synthetic capacity curve: `capacity` requests run in parallel, the rest queue.
+
+    Latency grows linearly once the server is saturated and requests time out past
+    `timeout_factor` times the capacity.
+    """
+
+    def __init__(self, capacity, base_latency=1.0, timeout_factor=3):
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.timeout_factor = timeout_factor
+
+    def latency(self, in_flight):
+        return self.base_latency * max(1.0, in_flight / self.capacity)
+
+    def times_out(self, in_flight):
+        return in_flight > self.capacity * self.timeout_factor
+
+
+def simulate(limiter, server, samples):
+    limits = []
+    for _ in range(samples):
+        in_flight = limiter.limit
+        limiter.record(server.latency(in_flight), server.times_out(in_flight))
+        limits.append(limiter.limit)
+    return limits
+
+def test_limiter_rejects_bad_limits():
+    with raises(ValueError):
+        AdaptiveLimiter(initial_limit=8, max_limit=4)
+
+def test_limiter_converges_to_capacity():
+    server = StubServer(capacity=6)
+    limiter = AdaptiveLimiter(max_limit=32)
+    limits = simulate(limiter, server, 600)
+    steady = limits[300:]
+    # never below capacity (full throughput); queueing stays near the latency tolerance,
+    # a little above it since the windowed baseline only sees loaded samples
+    assert server.capacity <= min(steady)
+    assert sum(server.latency(n) for n in steady) / len(steady) <= 1.6
+    actions = {d['action'] for d in limiter.metrics['decisions']}
+    assert {'increase', 'decrease (latency)'} <= actions
+
+def test_limiter_recovers_from_a_fast_outlier():
+    server = StubServer(capacity=6)
+    limiter = AdaptiveLimiter(max_limit=32)
+    limiter.record(0.6)
+    limits = simulate(limiter, server, 1000)
+    assert server.capacity <= min(limits[500:])
+
+def test_limiter_follows_baseline_change():
+    server = StubServer(capacity=6)
+    limiter = AdaptiveLimiter(max_limit=32)
+    simulate(limiter, server, 600)
+    for base_latency in (3.0, 0.3):
+        server.base_latency = base_latency
+        steady = simulate(limiter, server, 900)[300:]
+        assert server.capacity <= min(steady)
+        queueing = sum(server.latency(n) for n in steady) / len(steady) / base_latency
+        assert queueing <= 1.6
+
+def test_limiter_backs_off_on_errors():
+    # latency-blind, so only timeouts can stop the growth
+    server = StubServer(capacity=2, timeout_factor=2)
+    limiter = AdaptiveLimiter(max_limit=32, latency_tolerance=100)
+    limits = simulate(limiter, server, 600)
+    assert max(limits[300:]) <= 5
+    assert limiter.metrics['errors'] > 0
+
+def test_limiter_stays_within_bounds():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=2, max_limit=4)
+    simulate(limiter, StubServer(capacity=100), 200)
+    assert limiter.limit == 4
+    simulate(limiter, StubServer(capacity=1, timeout_factor=0), 200)
+    assert limiter.limit == 2
+
+
+class FakeRequester:
+    def __init__(self, server, tracker, fail=False, local_seconds=0.0):
+        self.server = server
+        self.tracker = tracker
+        self.fail = fail
+        # stands for the render, done before taking a slot
+        self.local_seconds = local_seconds
+
+    def request(
+        self, slot: Callable[[], AbstractContextManager[None]] = nullcontext
+    ) -> int:
+        time.sleep(self.local_seconds)
+        with slot():
+            in_flight = self.tracker.enter()
+            try:
+                time.sleep(self.server.latency(in_flight))
+                if self.fail:
+                    raise RuntimeError("boom")
+                return in_flight
+            finally:
+                self.tracker.leave()
+
+
+class InFlightTracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            return self.current
+
+    def leave(self):
+        with self.lock:
+            self.current -= 1
+
+def test_request_batch_against_stub_server():
+    server = StubServer(capacity=3, base_latency=0.01)
+    tracker = InFlightTracker()
+    limiter = AdaptiveLimiter(max_limit=8)
+    requesters = [FakeRequester(server, tracker) for _ in range(120)]
+    requesters[5] = FakeRequester(server, tracker, fail=True)
+    results = request_batch(requesters, limiter)
+    assert len(results) == 120
+    assert isinstance(results[5], RuntimeError)
+    assert tracker.peak <= 8
+    assert limiter.metrics['completed'] == 120
+    assert limiter.metrics['in_flight'] == 0
+    assert limiter.limit > 1
+
+def test_request_batch_times_the_server_only():
+    server = StubServer(capacity=100, base_latency=0.01)
+    limiter = AdaptiveLimiter(max_limit=4)
+    requesters = [FakeRequester(server, InFlightTracker(), local_seconds=0.05) for _ in range(8)]
+    request_batch(requesters, limiter)
+    assert limiter.metrics['baseline_latency'] < 0.04
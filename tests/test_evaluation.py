@@ -0,0 +1,80 @@
+import json
+import os
+
+from ai_invoice_extractor.evaluation import (
+    format_report,
+    load_batch_results,
+    load_json,
+    pareto_report,
+    score_results,
+)
+
+ground_truth = load_json(os.path.join(os.path.dirname(__file__), 'test_data', 'ground_truth.json'))
+models = [
+    {"name": "small", "parameters": 3, "size": 3.0},
+    {"name": "big", "parameters": 32, "size": 21.0},
+    {"name": "slow", "parameters": 7, "size": 6.0},
+]
+exact = json.dumps(ground_truth['invoice-test-1.pdf'])
+
+def result(model, parameters, elapsed, raw, pdf_file='invoice-test-1.pdf'):
+    return {'pdf_file': pdf_file, 'model_name': model, 'model_parameters': parameters,
+            'elapsed': elapsed, 'raw': raw}
+
+def test_score_results_weights():
+    wrong_supplier = dict(ground_truth['invoice-test-1.pdf'], supplier="Other")
+    wrong_date = dict(ground_truth['invoice-test-1.pdf'], date="2025-08-26")
+    results = [
+        result('small', 3, 1.0, f"```json\n{exact}\n```"),
+        result('small', 3, 1.0, json.dumps(wrong_supplier)),
+        result('small', 3, 1.0, json.dumps(wrong_date)),
+        result('small', 3, 1.0, "not json"),
+    ]
+    assert score_results(results, ground_truth).tolist() == [100.0, 70.0, 75.0, 0.0]
+
+def test_score_results_missing_fields():
+    raw = json.dumps(dict.fromkeys(ground_truth['invoice-test-6.pdf']))
+    results = [result('small', 3, 1.0, raw, pdf_file='invoice-test-6.pdf')]
+    assert score_results(results, ground_truth).tolist() == [100.0]
+
+def test_score_results_unparsable_amounts():
+    junk = {"total_excluding_vat": "abc", "total_vat": "N/A", "total_including_vat": "unknown",
+            "date": None, "supplier": None}
+    invoice_1 = dict(ground_truth['invoice-test-1.pdf'], total_vat="N/A")
+    results = [
+        result('small', 3, 1.0, json.dumps(junk), pdf_file='invoice-test-6.pdf'),
+        result('small', 3, 1.0, json.dumps(invoice_1)),
+    ]
+    assert score_results(results, ground_truth).tolist() == [55.0, 85.0]
+
+def test_pareto_report():
+    results = [
+        result('small', 3, 2.0, exact),
+        result('big', 32, 10.0, exact),
+        result('slow', 7, 20.0, "{}"),
+    ]
+    rows = pareto_report(results, score_results(results, ground_truth), models)
+    assert [(r['model_name'], r['pareto']) for r in rows] == [
+        ('small', True), ('big', False), ('slow', False)
+    ]
+    assert rows[0]['size'] == 3.0
+    assert rows[0]['median_latency'] == 2.0
+
+def test_pareto_report_unknown_size():
+    results = [result('small', 3, 2.0, exact), result('mystery', 3, 30.0, "{}")]
+    rows = pareto_report(results, score_results(results, ground_truth), models)
+    assert [(r['model_name'], r['size'], r['pareto']) for r in rows] == [
+        ('small', 3.0, True), ('mystery', None, None)
+    ]
+    assert format_report(rows).splitlines()[2].endswith("?  ?")
+
+def test_load_batch_results(tmp_path, capsys):
+    (tmp_path / 'invoice-test-1__qwen2.5vl__7b__12s.json').write_text(exact, encoding='utf-8')
+    (tmp_path / 'invoice-test-2__qwen2.5vl__32b__0.412s.json').write_text(exact, encoding='utf-8')
+    (tmp_path / 'invoice-test-3__qwen2.5vl__01-05.json').write_text(exact, encoding='utf-8')
+    (tmp_path / 'metrics.csv').write_text('', encoding='utf-8')
+    results = load_batch_results(str(tmp_path))
+    assert [(r['pdf_file'], r['model_parameters'], r['elapsed']) for r in results] == [
+        ('invoice-test-1.pdf', 7, 12.0), ('invoice-test-2.pdf', 32, 0.412)
+    ]
+    assert "Skipped 1 output" in capsys.readouterr().err
@@ -0,0 +1,69 @@
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from ai_invoice_extractor.preprocessing import (
+    background_threshold,
+    content_bbox,
+    crop_to_content,
+    estimate_skew,
+    ink_mask,
+)
+
+
+def receipt_page(background: str | tuple[int, int, int] = 'white'):
+    page = Image.new('RGB', (1654, 2339), background)
+    draw = ImageDraw.Draw(page)
+    draw.rectangle((560, 260, 1040, 920), fill='white')
+    for y in range(300, 900, 30):
+        draw.rectangle((600, y, 1000, y + 8), fill='black')
+    return page
+
+def test_content_bbox():
+    mask = ink_mask(receipt_page())
+    assert content_bbox(mask) == (600, 300, 1001, 879)
+
+def test_content_bbox_blank_page():
+    mask = ink_mask(Image.new('RGB', (80, 100), 'white'))
+    assert content_bbox(mask) is None
+
+def test_content_bbox_ignores_specks():
+    pixels = np.full((1000, 800), 255, dtype=np.uint8)
+    pixels[10, 10] = 0
+    pixels[200:300, 100:700] = 0
+    assert content_bbox(ink_mask(Image.fromarray(pixels))) == (100, 200, 700, 300)
+
+def test_crop_to_content_reports_reduction():
+    cropped, stats = crop_to_content(receipt_page(), margin=10)
+    assert cropped.size == (421, 599)
+    assert stats == {'original_pixels': 1654 * 2339, 'cropped_pixels': 421 * 599}
+
+def test_estimate_skew():
+    tilted = receipt_page().rotate(3, fillcolor='white')
+    assert estimate_skew(ink_mask(tilted)) == 3.0
+
+def test_crop_to_content_deskew():
+    tilted = receipt_page().rotate(3, fillcolor='white')
+    deskewed, _ = crop_to_content(tilted, deskew=True)
+    assert estimate_skew(ink_mask(deskewed)) == 0.0
+
+def test_background_threshold():
+    assert background_threshold(np.full((100, 100), 255, dtype=np.uint8)) == 215
+    assert background_threshold(np.full((100, 100), 180, dtype=np.uint8)) == 140
+
+def test_crop_to_content_grey_phone_scan():
+    # grey table around a white receipt strip, as a phone scan at luma 180 gives
+    page = receipt_page(background=(180, 180, 180))
+    cropped, stats = crop_to_content(page, margin=0)
+    assert cropped.size == (401, 579)
+    assert stats['cropped_pixels'] < stats['original_pixels'] / 10
+
+def test_estimate_skew_memory_is_bounded():
+    # a page that is almost all ink is the worst case for the projection search
+    mask = np.ones((2339, 1654), dtype=bool)
+    tracemalloc.start()
+    estimate_skew(mask)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 20 * 1024 * 1024
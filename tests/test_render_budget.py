@@ -0,0 +1,41 @@
+import threading
+import time
+
+from pytest import raises
+
+from ai_invoice_extractor import RenderBudget
+
+
+def test_render_budget_rejects_non_positive():
+    with raises(ValueError):
+        RenderBudget(0)
+
+def test_render_budget_tracks_peak():
+    budget = RenderBudget(100)
+    with budget.reserve(40):
+        with budget.reserve(60):
+            assert budget.in_flight_bytes == 100
+    assert budget.in_flight_bytes == 0
+    assert budget.peak_bytes == 100
+
+def test_render_budget_oversized_render_runs_alone():
+    budget = RenderBudget(10)
+    with budget.reserve(50):
+        assert budget.in_flight_bytes == 50
+
+def test_render_budget_throttles_concurrent_renders():
+    budget = RenderBudget(100)
+    entered = threading.Event()
+
+    def render():
+        with budget.reserve(60):
+            entered.set()
+
+    with budget.reserve(60):
+        worker = threading.Thread(target=render)
+        worker.start()
+        time.sleep(0.05)
+        assert not entered.is_set()
+    worker.join(timeout=1)
+    assert entered.is_set()
+    assert budget.peak_bytes == 60
@@ -0,0 +1,72 @@
+import csv
+import json
+
+import numpy as np
+from pytest import importorskip, raises
+
+from ai_invoice_extractor import Response, ResponseBatch
+
+raw = json.dumps({"total_excluding_vat": "10,21", "total_vat": 2.04, "total_including_vat": 12.25,
+                  "date": "03/07/2025", "supplier": "MALRIEU SA"})
+
+def test_response_parses_lazily():
+    response = Response(f"```json\n{raw}\n```")
+    assert not response._parsed
+    assert response.total_excluding_vat == 10.21
+    assert response._parsed
+    assert response.date == "03/07/2025"
+    assert response.supplier == "MALRIEU SA"
+
+def test_response_is_slotted():
+    response = Response(raw)
+    with raises(AttributeError):
+        setattr(response, 'extra', 1)
+
+def test_response_invalid_json():
+    response = Response("not json")
+    with raises(ValueError):
+        _ = response.total_vat
+    with raises(ValueError):
+        Response("[1, 2]").deserialize()
+
+def test_response_batch_totals():
+    batch = ResponseBatch([raw, Response(raw), "not json",
+                           json.dumps({"total_including_vat": 31.0})])
+    assert len(batch) == 4
+    assert batch.totals() == {
+        'total_excluding_vat': 20.42,
+        'total_vat': 4.08,
+        'total_including_vat': 55.5,
+    }
+    assert batch.column('parsed').tolist() == [True, True, False, True]
+    assert np.isnan(batch.column('total_vat')[2])
+    with raises(KeyError):
+        batch.sum('supplier')
+
+def test_response_batch_to_csv(tmp_path):
+    path = tmp_path / 'results.csv'
+    ResponseBatch([raw, "not json"], keep_raw=True).to_csv(str(path))
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]['total_excluding_vat'] == '10.21'
+    assert rows[0]['supplier'] == 'MALRIEU SA'
+    assert rows[1]['total_vat'] == ''
+    assert rows[1]['parsed'] == 'False'
+    assert rows[1]['raw'] == 'not json'
+
+def test_response_batch_column_survives_append():
+    batch = ResponseBatch([raw])
+    column = batch.column('total_vat')
+    batch.append(raw)
+    assert column.tolist() == [2.04]
+    assert batch.column('total_vat').tolist() == [2.04, 2.04]
+    assert batch.sum('total_vat') == 4.08
+
+def test_response_batch_to_parquet(tmp_path):
+    pq = importorskip("pyarrow.parquet")
+    path = tmp_path / 'results.parquet'
+    ResponseBatch([raw, "not json"]).to_parquet(str(path))
+    table = pq.read_table(path).to_pydict()
+    assert table['total_excluding_vat'] == [10.21, None]
+    assert table['supplier'] == ['MALRIEU SA', None]
+    assert table['parsed'] == [True, False]
@@ -0,0 +1,97 @@
+import json
+import threading
+from datetime import date
+
+from pytest import fixture, raises
+
+from ai_invoice_extractor import ResultStore
+from ai_invoice_extractor.response import normalize_amount, normalize_date
+from ai_invoice_extractor.result_store import result_record
+
+
+def raw(total, day, supplier):
+    return json.dumps({"total_excluding_vat": None, "total_vat": "2,04",
+                       "total_including_vat": total, "date": day, "supplier": supplier})
+
+@fixture
+def store():
+    store = ResultStore()
+    store.add_many([
+        result_record(raw(75.02, "26/08/2025", "Station Mairie ARVIEU"), "aaa", "qwen7b", 12.0),
+        result_record(raw("28,06 €", "27/08/2025", "SARL GARAGE MONTEILLET"), "bbb", "qwen7b"),
+        result_record(raw(31.0, "03/07/2025", "Restaurant L'atelier"), "ccc", "qwen3b"),
+        result_record("not json", "ddd", "granite2b"),
+    ])
+    yield store
+    store.close()
+
+def test_normalize_amount():
+    assert normalize_amount("62,52") == 62.52
+    assert normalize_amount("1.234,56 €") == 1234.56
+    assert normalize_amount("1,234.56") == 1234.56
+    assert normalize_amount("1,234") == 1234.0
+    assert normalize_amount("12.345.678") == 12345678.0
+    assert normalize_amount("0,125") == 0.125
+    assert normalize_amount(12) == 12.0
+    assert normalize_amount("n/a") is None
+    assert normalize_amount(None) is None
+
+def test_normalize_date():
+    assert normalize_date("26/08/2025") == "2025-08-26"
+    assert normalize_date("2025-08-26") == "2025-08-26"
+    assert normalize_date("yesterday") is None
+
+def test_result_store_normalizes(store):
+    assert len(store) == 4
+    row = store.by_source_hash("bbb")[0]
+    assert row['total_including_vat'] == 28.06
+    assert row['total_vat'] == 2.04
+    assert row['date'] == "2025-08-27"
+    assert row['elapsed_seconds'] is None
+
+def test_result_store_keeps_unparsed_output(store):
+    row = store.by_source_hash("ddd")[0]
+    assert row['raw'] == "not json"
+    assert row['supplier'] is None
+
+def test_result_store_queries(store):
+    assert [r['source_hash'] for r in store.by_supplier("station mairie arvieu")] == ["aaa"]
+    assert [r['source_hash'] for r in store.by_supplier("garage", partial=True)] == ["bbb"]
+    in_august = store.by_date_range(date(2025, 8, 1), date(2025, 8, 31))
+    assert [r['source_hash'] for r in in_august] == ["aaa", "bbb"]
+    assert [r['source_hash'] for r in store.by_amount_range(28, 32)] == ["bbb", "ccc"]
+    with raises(ValueError):
+        store.by_amount_range(0, 1, column='raw')
+
+def test_result_store_date_range_reads_model_dates(store):
+    in_august = store.by_date_range("01/08/2025", "2025-08-31")
+    assert [r['source_hash'] for r in in_august] == ["aaa", "bbb"]
+    with raises(ValueError):
+        store.by_date_range("August", "2025-08-31")
+
+def test_result_store_partial_supplier_is_literal(store):
+    store.add(raw(1.0, "03/07/2025", "100% BIO"), "fff", "qwen7b")
+    assert [r['source_hash'] for r in store.by_supplier("100%", partial=True)] == ["fff"]
+    assert store.by_supplier("%", partial=True) == store.by_supplier("100% bio")
+    assert store.by_supplier("_", partial=True) == []
+
+def test_result_store_file(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    with ResultStore(path) as store:
+        store.add(raw(12.25, "03/07/2025", "MALRIEU SA"), "eee", "qwen2.5vl:7b", 3.5)
+    with ResultStore(path) as store:
+        assert store.by_source_hash("eee")[0]['supplier'] == "MALRIEU SA"
+
+def test_result_store_concurrent_writers(tmp_path):
+    with ResultStore(str(tmp_path / 'results.sqlite')) as store:
+        def write(worker):
+            for i in range(50):
+                store.add(raw(float(i), "03/07/2025", f"S{worker}"), f"{worker}-{i}", "qwen7b")
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(store) == 200
+        assert len(store.by_supplier("S3")) == 50
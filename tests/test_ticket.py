@@ -1,6 +1,6 @@
 import os
 from pytest import fixture, raises
-from ai_invoice_extractor import Ticket
+from ai_invoice_extractor import RenderBudget, Ticket
 
 @fixture
 def ticket():
@@ -31,4 +31,25 @@ def test_ticket_multi_page():
 def test_ticket2png(ticket):
     png_data = ticket.get_png_data()
     assert isinstance(png_data, bytes)
-    assert png_data.startswith(b'\x89PNG\r\n\x1a\n')  # PNG file signature
\ No newline at end of file
+    assert png_data.startswith(b'\x89PNG\r\n\x1a\n')  # PNG file signature
+
+def test_ticket_rendered_png_is_removed(ticket):
+    with ticket.rendered_png() as png_path:
+        assert png_path.read_bytes().startswith(b'\x89PNG\r\n\x1a\n')
+    assert not png_path.exists()
+    assert ticket.render_stats['png_bytes'] > 0
+    assert ticket.render_stats['estimated_raster_bytes'] == ticket.estimate_render_bytes()
+
+def test_ticket_rendered_png_stays_budgeted(ticket):
+    budget = RenderBudget(1 << 30)
+    with ticket.rendered_png(budget):
+        # the file, the bytes read by the client and their base64 encoding
+        assert budget.in_flight_bytes >= 3 * ticket.render_stats['png_bytes']
+    assert budget.in_flight_bytes == 0
+    assert budget.peak_bytes >= ticket.estimate_render_bytes()
+
+def test_ticket_crop_reduces_pixels():
+    ticket = Ticket("test_data/pdf/invoice-test-1.pdf", crop=True)
+    ticket.get_png_data()
+    stats = ticket.render_stats
+    assert 0 < stats['cropped_pixels'] <= stats['original_pixels']